@@ -3,101 +3,133 @@
 # Flow: API-Key → Landing (template buttons) → Setup → Profile → Interview  #
 # Fix: interviewer gets a real name; no “[Interviewer’s Name]” placeholders #
 #############################################################################
+from __future__ import annotations
+
 import os
 import time
-import textwrap
-from typing import Dict, List
+import random
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Coroutine, Dict, Iterator, List, Optional, Tuple
 
 import streamlit as st
-from dotenv import load_dotenv
-from groq import Groq, GroqError
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+
+from prompts import (EVAL_RUBRIC, GREETING_PROMPT, PRELOADED_TEMPLATES,
+                     PROFILE_PROMPT, QUESTION_RUBRIC, REPORT_PROMPT,
+                     SUMMARY_PROMPT, TEMPLATE_CHOICES, split_profile,
+                     strip_label)
+
+if TYPE_CHECKING:  # imported lazily at runtime, off the cold path
+    from groq import AsyncGroq, Groq, GroqError
 
 # or "mixtral-8x7b-32768"
 MODEL_NAME = "meta-llama/llama-4-maverick-17b-128e-instruct"
-load_dotenv()
-
-# ───────────────────────── Templates ───────────────────────── #
-PRELOADED_TEMPLATES: Dict[str, Dict] = {
-    "Full-Stack Developer": {
-        "company_name": "Tech Corp",
-        "job_title": "Senior Full-Stack Developer",
-        "company_desc": "A product-led SaaS scale-up delivering web & mobile solutions.",
-        "job_desc": "Own the end-to-end SDLC, design scalable REST/GraphQL APIs, and coach juniors.",
-        "round": "Technical",
-        "tech_stack": "Python, TypeScript, React, Node.js, AWS",
-        "criteria": "System-design depth, code quality, mentorship mindset."
-    },
-    "Machine-Learning Engineer": {
-        "company_name": "Vision AI Labs",
-        "job_title": "ML Engineer",
-        "company_desc": "We build computer-vision products for logistics.",
-        "job_desc": "Prototype & ship deep-learning models, own MLOps pipeline.",
-        "round": "Technical",
-        "tech_stack": "Python, PyTorch, TensorFlow, Kubeflow",
-        "criteria": "Model-building, data-centric mindset, deployment chops."
-    },
-    "DevOps Engineer": {
-        "company_name": "CloudOps Inc.",
-        "job_title": "DevOps Engineer (AWS / K8s)",
-        "company_desc": "Managed-services provider focused on high-availability platforms.",
-        "job_desc": "Automate IaC, CI/CD, observability and incident response.",
-        "round": "Technical",
-        "tech_stack": "AWS, Terraform, Docker, Kubernetes, Go",
-        "criteria": "Resilience patterns, IaC best-practices, SRE thinking."
-    },
-    "Product Manager": {
-        "company_name": "FinTech Neo",
-        "job_title": "Product Manager – Payments",
-        "company_desc": "Digital bank building next-gen payments experience.",
-        "job_desc": "Define roadmap, own KPIs, collaborate with design & engineering.",
-        "round": "Behavioral",
-        "tech_stack": "",
-        "criteria": "Stakeholder comms, metrics-driven decisions, user empathy."
-    },
-}
 
 # ───────────────────── Session defaults ───────────────────── #
 
 
+@st.cache_resource(show_spinner=False)
+def _env() -> bool:
+    # parse .env once per process, not on every script rerun
+    from dotenv import load_dotenv
+    load_dotenv()
+    return True
+
+
 def init_session():
+    if "page" in st.session_state:  # already initialised for this session
+        return
+    _env()
     defaults = {
         "page": "apikey" if not os.getenv("GROQ_API_KEY") else "landing",
         "api_key": os.getenv("GROQ_API_KEY", ""),
-        "client": None,
+        "key_validated": False,
         "form": {
             "company_name": "", "job_title": "",
             "company_desc": "", "job_desc": "",
             "round": "Technical", "tech_stack": "", "criteria": ""
         },
-        "profile_md": "", "history": [], "show_eval": True, "report_md": ""
+        "profile_md": "", "pending_greeting": "", "history": [], "messages": [],
+        "convo_str": "", "summary": "", "summarized_upto": 0, "summary_job": None,
+        "summary_retry_at": 0,
+        "show_eval": True, "report_md": "", "pending": None
     }
     for k, v in defaults.items():
         st.session_state.setdefault(k, v)
+    if st.session_state.api_key:  # key from .env → landing page, warm up now
+        start_prewarm(st.session_state.api_key)
 
+# ───────────────────── Groq helpers ──────────────────────── #
 
-init_session()
 
-# ───────────────────── Groq helpers ──────────────────────── #
+def _groq():
+    # deferred import keeps the SDK off the API-key page's cold path; after
+    # the first call it is a sys.modules lookup
+    import groq
+    return groq
+
+
+@st.cache_resource(show_spinner=False)
+def _build_client(api_key: str) -> Groq:
+    # one shared client (and connection pool) per key, across sessions & reruns
+    return _groq().Groq(api_key=api_key)
+
+
+@st.cache_data(show_spinner=False)
+def _validate_key(api_key: str) -> bool:
+    # raises GroqError on a bad key (exceptions are not cached)
+    _build_client(api_key).chat.completions.create(model=MODEL_NAME,
+                                                   messages=[
+                                                       {"role": "user", "content": "ping"}],
+                                                   max_tokens=1)
+    return True
+
+
+def _prewarm(api_key: str):
+    try:
+        _validate_key(api_key)
+    except _groq().GroqError:
+        pass  # surfaced by get_client() on first real use
+
+
+def start_prewarm(api_key: str):
+    # open the connection + validate while the user reads the landing page
+    t = threading.Thread(target=_prewarm, args=(api_key,), daemon=True)
+    add_script_run_ctx(t)
+    t.start()
 
 
 def get_client() -> Groq:
-    if st.session_state.client:
-        return st.session_state.client
     key = st.session_state.api_key
     if not key:
         st.session_state.page = "apikey"
         st.rerun()
+    if not st.session_state.key_validated:
+        try:
+            _validate_key(key)
+        except _groq().GroqError as e:
+            st.error(f"API key error: {e.message}")
+            st.stop()
+        st.session_state.key_validated = True
+    return _build_client(key)
+
+
+RETRY_STATUS = (408, 429, 500, 502, 503, 504)
+MAX_RETRY_WAIT = 30.0  # seconds; don't park a rerun on a long Retry-After
+
+
+def _retry_delay(e: GroqError, attempt: int) -> Optional[float]:
+    # None → give up (non-retryable, or last of 3 attempts); otherwise honour
+    # Retry-After, else full jitter so concurrent sessions don't retry in sync
+    if getattr(e, "status_code", None) not in RETRY_STATUS or attempt == 2:
+        return None
+    response = getattr(e, "response", None)
     try:
-        cli = Groq(api_key=key)
-        cli.chat.completions.create(model=MODEL_NAME,
-                                    messages=[
-                                        {"role": "user", "content": "ping"}],
-                                    max_tokens=1)
-    except GroqError as e:
-        st.error(f"API key error: {e.message}")
-        st.stop()
-    st.session_state.client = cli
-    return cli
+        return min(float(response.headers.get("retry-after")), MAX_RETRY_WAIT)
+    except (AttributeError, TypeError, ValueError):
+        return random.uniform(0, 2 ** attempt)
 
 
 def groq_chat(msgs: List[Dict], temperature: float = 0.4) -> str:
@@ -108,11 +140,98 @@ def groq_chat(msgs: List[Dict], temperature: float = 0.4) -> str:
                                             messages=msgs,
                                             temperature=temperature)
             return r.choices[0].message.content
-        except GroqError as e:
-            if e.status_code in (429, 500, 503):
-                time.sleep(2 ** attempt)
-            else:
+        except _groq().GroqError as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None:
+                raise
+            time.sleep(delay)
+
+
+def groq_stream(msgs: List[Dict], temperature: float = 0.4) -> Iterator[str]:
+    cli = get_client()
+    for attempt in range(3):  # retry opening the stream only
+        try:
+            stream = cli.chat.completions.create(model=MODEL_NAME,
+                                                 messages=msgs,
+                                                 temperature=temperature,
+                                                 stream=True)
+            break
+        except _groq().GroqError as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None:
+                raise
+            time.sleep(delay)
+    for chunk in stream:
+        yield chunk.choices[0].delta.content or ""
+
+
+@st.cache_resource(show_spinner=False)
+def _event_loop() -> asyncio.AbstractEventLoop:
+    # long-lived loop: the cached AsyncGroq's connection pool is bound to it
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+@st.cache_resource(show_spinner=False)
+def _build_async_client(api_key: str) -> AsyncGroq:
+    return _groq().AsyncGroq(api_key=api_key)
+
+
+def get_async_client() -> AsyncGroq:
+    get_client()  # key check + one-off validation
+    return _build_async_client(st.session_state.api_key)
+
+
+async def _achat(cli: AsyncGroq, msgs: List[Dict], temperature: float) -> str:
+    for attempt in range(3):
+        try:
+            r = await cli.chat.completions.create(model=MODEL_NAME,
+                                                  messages=msgs,
+                                                  temperature=temperature)
+            return r.choices[0].message.content
+        except _groq().GroqError as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None:
                 raise
+            await asyncio.sleep(delay)
+
+
+def groq_chat_async(msgs: List[Dict], temperature: float = 0.4) -> Coroutine:
+    # resolve the client here: the coroutine body runs off the script thread
+    return _achat(get_async_client(), msgs, temperature)
+
+
+async def _astream(cli: AsyncGroq, msgs: List[Dict], temperature: float,
+                   buf: List[str]) -> str:
+    for attempt in range(3):  # retry opening the stream only
+        try:
+            stream = await cli.chat.completions.create(model=MODEL_NAME,
+                                                       messages=msgs,
+                                                       temperature=temperature,
+                                                       stream=True)
+            break
+        except _groq().GroqError as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+    async for chunk in stream:
+        buf.append(chunk.choices[0].delta.content or "")
+    return "".join(buf)
+
+
+def groq_stream_async(msgs: List[Dict], temperature: float,
+                      buf: List[str]) -> Coroutine:
+    # deltas land in `buf` as they arrive so a rerun can show partial text
+    return _astream(get_async_client(), msgs, temperature, buf)
+
+
+def submit_async(*coros: Coroutine, return_exceptions: bool = False) -> Future:
+    # schedule on the background loop; the future resolves to the results list
+    async def _gather():
+        return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+    return asyncio.run_coroutine_threadsafe(_gather(), _event_loop())
 
 # ───────────────────── Page: API-Key ─────────────────────── #
 
@@ -123,7 +242,10 @@ def page_apikey():
     key = st.text_input("Groq API Key", type="password",
                         value=st.session_state.api_key)
     if st.button("Save & continue", type="primary") and key:
+        if key != st.session_state.api_key:
+            st.session_state.key_validated = False
         st.session_state.api_key = key
+        start_prewarm(key)
         st.session_state.page = "landing"
         st.rerun()
 
@@ -139,7 +261,8 @@ def page_landing():
         with col:
             if st.button(name, use_container_width=True):
                 st.session_state.form.update(tpl)
-                st.session_state.profile_md = generate_profile(tpl)
+                (st.session_state.profile_md,
+                 st.session_state.pending_greeting) = generate_profile(tpl)
                 st.session_state.page = "profile"
                 st.rerun()
     st.markdown("---")
@@ -152,9 +275,8 @@ def page_landing():
 
 def page_setup():
     st.header("Setup (1/3)")
-    tpl_names = ["— choose template —"] + list(PRELOADED_TEMPLATES.keys())
-    chosen = st.selectbox("Load a template", tpl_names, index=0)
-    if chosen != tpl_names[0]:
+    chosen = st.selectbox("Load a template", TEMPLATE_CHOICES, index=0)
+    if chosen != TEMPLATE_CHOICES[0]:
         st.session_state.form.update(PRELOADED_TEMPLATES[chosen])
 
     with st.form("setup"):
@@ -183,36 +305,27 @@ def page_setup():
             "Evaluation criteria", f["criteria"], height=100)
 
         if st.form_submit_button("Generate interviewer profile", type="primary"):
-            st.session_state.profile_md = generate_profile(f)
+            (st.session_state.profile_md,
+             st.session_state.pending_greeting) = generate_profile(f)
             st.session_state.page = "profile"
             st.rerun()
 
 
-def generate_profile(form: Dict) -> str:
-    tech_block = f"Tech Stack: {form['tech_stack']}\n" if form['tech_stack'] else ""
-    prompt = textwrap.dedent(f"""
-        You are an expert interviewer-profile generator.
-
-        Produce a concise markdown profile including:
-        1. **A realistic Name & Title** (e.g. “Jordan Lee – Senior Product Manager”) — **never use placeholders**
-        2. Interview Style
-        3. Core Focus Areas
-        4. Typical Question Types
-        5. Evaluation Rubric
-        6. Culture-fit Signals
-        7. Common Candidate Mistakes
-
-        Company: {form['company_name']}
-        Job title: {form['job_title']}
-        Company description: {form['company_desc']}
-        Job description: {form['job_desc']}
-        Interview round: {form['round']}
-        {tech_block}
-        Evaluation criteria: {form['criteria']}
-    """)
+def generate_profile(form: Dict) -> Tuple[str, str]:
+    # one call yields both the profile and the interview opener
     with st.spinner("Crafting interviewer profile…"):
-        return groq_chat([{"role": "system", "content": "You are an expert interview assistant"},
-                          {"role": "user", "content": prompt}], 0.3)
+        raw = _profile_for(tuple(sorted(form.items())))
+    return split_profile(raw)
+
+
+@st.cache_data(show_spinner=False, ttl=24 * 60 * 60)
+def _profile_for(form_tuple: tuple) -> str:
+    # keyed on the form contents: re-picking a template is a cache hit
+    form = dict(form_tuple)
+    tech_block = f"Tech Stack: {form['tech_stack']}\n" if form['tech_stack'] else ""
+    prompt = PROFILE_PROMPT.format(**form, tech_block=tech_block)
+    return groq_chat([{"role": "system", "content": "You are an expert interview assistant"},
+                      {"role": "user", "content": prompt}], 0.3)
 
 # ───────────────────── Page: Profile ─────────────────────── #
 
@@ -223,6 +336,10 @@ def page_profile():
     c1, c2 = st.columns(2)
     if c1.button("🚀 Start interview", type="primary"):
         st.session_state.history, st.session_state.report_md = [], ""
+        st.session_state.messages, st.session_state.pending = [], None
+        st.session_state.convo_str, st.session_state.summary = "", ""
+        st.session_state.summarized_upto, st.session_state.summary_job = 0, None
+        st.session_state.summary_retry_at = 0
         st.session_state.page = "interview"
         st.rerun()
     if c2.button("✏️ Edit setup"):
@@ -232,23 +349,90 @@ def page_profile():
 # ───────────────────── Page: Interview ───────────────────── #
 
 
+SUMMARY_EVERY = 10  # summarise once the verbatim window holds this many candidate turns
+KEEP_MESSAGES = 6   # newest messages kept verbatim when the window is cut back
+
+
+def interviewer_system(profile_md: str, rubric: str, summary: str = "") -> str:
+    # static prefix first (profile), so provider-side prompt caching can hit;
+    # the growing conversation follows as separate messages
+    prefix = f"You are an interviewer.\n\n{profile_md}\n{rubric}"
+    if summary:
+        prefix += f"\nEarlier in this interview (summary):\n{summary}\n"
+    return prefix
+
+
+def update_summary():
+    # keep the verbatim window bounded: older turns get folded into a rolling
+    # summary by a background call, picked up on a later rerun
+    ss = st.session_state
+    if ss.summary_job is not None:
+        cut, fut = ss.summary_job
+        if not fut.done():
+            return
+        ss.summary_job = None
+        try:
+            text = (fut.result()[0] or "").strip()
+        except _groq().GroqError:
+            text = ""
+        if text:
+            ss.summary, ss.summarized_upto = text, cut
+        else:  # back off until the next completed turn instead of every rerun
+            ss.summary_retry_at = len(ss.messages) + 2
+    if (len(ss.messages) - ss.summarized_upto >= 2 * SUMMARY_EVERY
+            and len(ss.messages) >= ss.summary_retry_at):
+        cut = len(ss.messages) - KEEP_MESSAGES
+        convo = "\n".join(
+            f"{'Interviewer' if m['role'] == 'assistant' else 'Candidate'}: {m['content']}"
+            for m in ss.messages[ss.summarized_upto:cut])
+        prompt = SUMMARY_PROMPT.format(summary=ss.summary or "(none)", convo=convo)
+        ss.summary_job = (cut, submit_async(groq_chat_async(
+            [{"role": "system", "content": "You are an expert interview assistant"},
+             {"role": "user", "content": prompt}], 0.2)))
+
+
 def page_interview():
     st.header("Live interview (3/3)")
 
-    # Generate interviewer greeting if history is empty
+    # Interviewer greeting if history is empty (pre-seeded by generate_profile)
     if not st.session_state.history:
-        greet_prompt = textwrap.dedent(f"""
-            {st.session_state.profile_md}
-
-            Start the mock interview with:
-            • A brief professional greeting **using your own name** from the profile \
-              (or invent one). **Do not write “[Interviewer’s Name]”.**
-            • The first tailored question.
-        """)
-        greeting = groq_chat([{"role": "system", "content": "You are an interviewer."},
-                              {"role": "user", "content": greet_prompt}], 0.5).strip()
+        greeting = (st.session_state.pending_greeting
+                    or _greeting_for(st.session_state.profile_md))
         st.session_state.history.append({"role": "interviewer",
                                          "content": greeting, "eval": None})
+        st.session_state.messages.append({"role": "assistant", "content": greeting})
+        st.session_state.convo_str += f"Interviewer: {greeting}\n"
+
+    # interviewer turn generated in the background: fold it in before rendering
+    pending, turn_error = st.session_state.pending, None
+    if pending is not None and pending["future"].done():
+        # results may be exceptions: GroqError after retries, or a transport
+        # error raised mid-stream
+        eval_res, question_res = pending["future"].result()
+        st.session_state.pending = pending = None
+        if isinstance(question_res, Exception):
+            # drop the unanswered turn so roles keep alternating and the
+            # report transcript stays consistent
+            st.session_state.history.pop()
+            st.session_state.messages.pop()
+            turn_error = question_res
+        else:
+            # a failed evaluation shouldn't cost the question
+            eval_text = ("" if isinstance(eval_res, Exception)
+                         else strip_label(eval_res or ""))
+            question = strip_label(question_res)
+            # last candidate message
+            st.session_state.history[-1]["eval"] = eval_text
+            st.session_state.history.append({"role": "interviewer",
+                                             "content": question, "eval": None})
+            st.session_state.messages.append({"role": "assistant", "content": question})
+            # report transcript, appended as turns complete
+            answer = st.session_state.history[-2]["content"]
+            st.session_state.convo_str += (
+                f"Candidate: {answer}{'  [Eval: ' + eval_text + ']' if eval_text else ''}\n"
+                f"Interviewer: {question}\n")
+
+    update_summary()
 
     # render chat
     for msg in st.session_state.history:
@@ -258,75 +442,66 @@ def page_interview():
                 with st.expander("Evaluation"):
                     st.markdown(msg["eval"])
 
+    if turn_error is not None:
+        st.error(f"The interviewer couldn't reply ({turn_error}). "
+                 "Please send your answer again.")
+    elif pending is not None:
+        with st.chat_message("interviewer"):
+            st.status("Interviewer is typing…")
+            if pending["buf"]:
+                st.markdown("".join(pending["buf"]))
+
     # candidate reply
-    if (user_txt := st.chat_input("Your answer…")):
+    if (user_txt := st.chat_input("Your answer…", disabled=pending is not None)):
         st.session_state.history.append({"role": "candidate",
                                          "content": user_txt, "eval": None})
-        convo = "\n".join(
-            f"{m['role']}: {m['content']}" for m in st.session_state.history)
-        follow = textwrap.dedent(f"""
-            {st.session_state.profile_md}
-
-            Continue the interview.
-
-            Provide exactly two lines:
-            EVALUATION: <brief feedback>
-            QUESTION: <specific follow-up question>
-
-            Conversation so far:
-            {convo}
-        """)
-        resp = groq_chat([{"role": "system", "content": "You are an interviewer."},
-                          {"role": "user", "content": follow}], 0.5).strip()
-        try:
-            e_part, q_part = resp.split("QUESTION:", 1)
-            eval_text = e_part.replace("EVALUATION:", "").strip()
-            question = q_part.strip()
-        except ValueError:
-            eval_text, question = "", resp
-
-        with st.chat_message("interviewer"):
-            st.markdown(question)
-            if st.session_state.show_eval and eval_text:
-                with st.expander("Evaluation"):
-                    st.markdown(eval_text)
+        st.session_state.messages.append({"role": "user", "content": user_txt})
+        turns = st.session_state.messages[st.session_state.summarized_upto:]
+        profile_md, summary = st.session_state.profile_md, st.session_state.summary
+        buf: List[str] = []
+        # evaluation and question run concurrently on the background loop;
+        # reruns paint the chat immediately and poll for the result
+        eval_sys = interviewer_system(profile_md, EVAL_RUBRIC, summary)
+        question_sys = interviewer_system(profile_md, QUESTION_RUBRIC, summary)
+        st.session_state.pending = {"buf": buf, "future": submit_async(
+            groq_chat_async([{"role": "system", "content": eval_sys}, *turns], 0.5),
+            groq_stream_async([{"role": "system", "content": question_sys}, *turns],
+                              0.5, buf),
+            return_exceptions=True)}
+        st.rerun()
 
-        # last candidate message
-        st.session_state.history[-2]["eval"] = eval_text
-        st.session_state.history.append({"role": "interviewer",
-                                         "content": question, "eval": None})
+    if pending is not None:  # poll until the background turn completes
+        time.sleep(0.1)
+        st.rerun()
 
     # report
     if len(st.session_state.history) >= 4 and st.button("Generate interview report"):
+        st.markdown("---")
+        st.subheader("📄 Interview report")
         st.session_state.report_md = generate_report()
-        st.rerun()
-    if st.session_state.report_md:
+    elif st.session_state.report_md:
         st.markdown("---")
         st.subheader("📄 Interview report")
         st.markdown(st.session_state.report_md)
 
 
-def generate_report() -> str:
-    convo = "\n".join(
-        f"{m['role'].capitalize()}: {m['content']}"
-        f"{'  [Eval: '+m['eval']+']' if m.get('eval') else ''}"
-        for m in st.session_state.history)
-    prompt = textwrap.dedent(f"""
-        Role: interview evaluator. Write a detailed markdown report \
-        (summary, assessments, recommendations).
+@st.cache_data(show_spinner=False, ttl=24 * 60 * 60)
+def _greeting_for(profile_md: str) -> str:
+    greet_prompt = GREETING_PROMPT.format(profile_md=profile_md)
+    return groq_chat([{"role": "system", "content": "You are an interviewer."},
+                      {"role": "user", "content": greet_prompt}], 0.5).strip()
 
-        Profile:
-        {st.session_state.profile_md}
 
-        Conversation:
-        {convo}
-    """)
-    with st.spinner("Generating report…"):
-        return groq_chat([{"role": "system", "content": "You are an expert interview evaluator"},
-                          {"role": "user", "content": prompt}], 0.25)
+def generate_report() -> str:
+    prompt = REPORT_PROMPT.format(profile_md=st.session_state.profile_md,
+                                  convo=st.session_state.convo_str)
+    return st.write_stream(groq_stream(
+        [{"role": "system", "content": "You are an expert interview evaluator"},
+         {"role": "user", "content": prompt}], 0.25))
 
 
 # ───────────────────── Router ───────────────────────────── #
+init_session()
 router = {"apikey": page_apikey, "landing": page_landing,
           "setup": page_setup, "profile": page_profile, "interview": page_interview}
 router[st.session_state.page]()
@@ -0,0 +1,135 @@
+#############################################################################
+# prompts.py – interview templates and prompt skeletons                     #
+# Kept out of app.py: Streamlit re-runs that script on every interaction,   #
+# while an imported module is evaluated once and reused from sys.modules.   #
+#############################################################################
+import re
+import textwrap
+from typing import Dict, Tuple
+
+# ───────────────────────── Templates ───────────────────────── #
+PRELOADED_TEMPLATES: Dict[str, Dict] = {
+    "Full-Stack Developer": {
+        "company_name": "Tech Corp",
+        "job_title": "Senior Full-Stack Developer",
+        "company_desc": "A product-led SaaS scale-up delivering web & mobile solutions.",
+        "job_desc": "Own the end-to-end SDLC, design scalable REST/GraphQL APIs, and coach juniors.",
+        "round": "Technical",
+        "tech_stack": "Python, TypeScript, React, Node.js, AWS",
+        "criteria": "System-design depth, code quality, mentorship mindset."
+    },
+    "Machine-Learning Engineer": {
+        "company_name": "Vision AI Labs",
+        "job_title": "ML Engineer",
+        "company_desc": "We build computer-vision products for logistics.",
+        "job_desc": "Prototype & ship deep-learning models, own MLOps pipeline.",
+        "round": "Technical",
+        "tech_stack": "Python, PyTorch, TensorFlow, Kubeflow",
+        "criteria": "Model-building, data-centric mindset, deployment chops."
+    },
+    "DevOps Engineer": {
+        "company_name": "CloudOps Inc.",
+        "job_title": "DevOps Engineer (AWS / K8s)",
+        "company_desc": "Managed-services provider focused on high-availability platforms.",
+        "job_desc": "Automate IaC, CI/CD, observability and incident response.",
+        "round": "Technical",
+        "tech_stack": "AWS, Terraform, Docker, Kubernetes, Go",
+        "criteria": "Resilience patterns, IaC best-practices, SRE thinking."
+    },
+    "Product Manager": {
+        "company_name": "FinTech Neo",
+        "job_title": "Product Manager – Payments",
+        "company_desc": "Digital bank building next-gen payments experience.",
+        "job_desc": "Define roadmap, own KPIs, collaborate with design & engineering.",
+        "round": "Behavioral",
+        "tech_stack": "",
+        "criteria": "Stakeholder comms, metrics-driven decisions, user empathy."
+    },
+}
+TEMPLATE_CHOICES = ("— choose template —", *PRELOADED_TEMPLATES)
+
+# ───────────────────────── Prompts ─────────────────────────── #
+PROFILE_PROMPT = textwrap.dedent("""
+    You are an expert interviewer-profile generator.
+
+    Produce a concise markdown profile including:
+    1. **A realistic Name & Title** (e.g. “Jordan Lee – Senior Product Manager”) — **never use placeholders**
+    2. Interview Style
+    3. Core Focus Areas
+    4. Typical Question Types
+    5. Evaluation Rubric
+    6. Culture-fit Signals
+    7. Common Candidate Mistakes
+
+    Company: {company_name}
+    Job title: {job_title}
+    Company description: {company_desc}
+    Job description: {job_desc}
+    Interview round: {round}
+    {tech_block}
+    Evaluation criteria: {criteria}
+
+    After the profile, open the interview as that interviewer with two blocks:
+    FIRST_GREETING: <brief professional greeting using your own name from the profile — **never write “[Interviewer’s Name]”**>
+    FIRST_QUESTION: <the first tailored question>
+""")
+GREETING_PROMPT = textwrap.dedent("""
+    {profile_md}
+
+    Start the mock interview with:
+    • A brief professional greeting **using your own name** from the profile \
+      (or invent one). **Do not write “[Interviewer’s Name]”.**
+    • The first tailored question.
+""")
+REPORT_PROMPT = textwrap.dedent("""
+    Role: interview evaluator. Write a detailed markdown report \
+    (summary, assessments, recommendations).
+
+    Profile:
+    {profile_md}
+
+    Conversation:
+    {convo}
+""")
+EVAL_RUBRIC = textwrap.dedent("""
+    Evaluate the candidate's latest answer.
+    Reply with brief feedback only.
+""")
+QUESTION_RUBRIC = textwrap.dedent("""
+    Continue the interview.
+    Reply with one specific follow-up question only.
+""")
+SUMMARY_PROMPT = textwrap.dedent("""
+    Summarise this part of a mock interview in under 150 words: topics covered,
+    how the candidate answered, and any open threads. Fold in the earlier summary.
+
+    Earlier summary:
+    {summary}
+
+    Transcript:
+    {convo}
+""")
+
+# ───────────────────────── Parsing ─────────────────────────── #
+# labels tolerate markdown around them, e.g. "**QUESTION:**", "**QUESTION**:"
+# or "__FIRST_GREETING__ :"; only a closing marker matching the opening one is
+# consumed, so emphasis that starts the reply itself ("**Design** a …") survives
+_MARKED = r"\s*#*\s*(?P<m>[*_]{{0,3}}){label}(?P=m)?\s*:\s*(?:(?P=m)(?!\w))?\s*"
+_SEED_RE = re.compile(_MARKED.format(label="FIRST_(?:GREETING|QUESTION)"), re.I)
+_LABEL_RE = re.compile("^" + _MARKED.format(label="(?:EVALUATION|QUESTION)"), re.I)
+
+
+def split_profile(raw: str) -> Tuple[str, str]:
+    # (profile, opener): cut at the first label even if the other is missing
+    # or malformed, so the opener never leaks into the profile
+    labels = list(_SEED_RE.finditer(raw))
+    if not labels:
+        return raw.strip(), ""
+    ends = [m.start() for m in labels[1:]] + [len(raw)]
+    seed = (raw[m.end():end].strip() for m, end in zip(labels, ends))
+    return raw[:labels[0].start()].strip(), "\n\n".join(p for p in seed if p)
+
+
+def strip_label(reply: str) -> str:
+    # models sometimes echo a label anyway ("EVALUATION:", "**Question**:")
+    return _LABEL_RE.sub("", reply, count=1).strip()
@@ -0,0 +1,53 @@
+import pytest
+
+from prompts import split_profile, strip_label
+
+
+@pytest.mark.parametrize("raw", [
+    "# Jordan Lee\nStyle\nFIRST_GREETING: Hi, I'm Jordan.\nFIRST_QUESTION: Why us?",
+    "# Jordan Lee\nStyle\n**FIRST_GREETING:** Hi, I'm Jordan.\n**FIRST_QUESTION:** Why us?",
+    "# Jordan Lee\nStyle\n**FIRST_GREETING**: Hi, I'm Jordan.\n**FIRST_QUESTION**: Why us?",
+    "# Jordan Lee\nStyle\n__first_greeting__ : Hi, I'm Jordan.\n### FIRST_QUESTION: Why us?",
+])
+def test_split_profile_label_variants(raw):
+    assert split_profile(raw) == ("# Jordan Lee\nStyle", "Hi, I'm Jordan.\n\nWhy us?")
+
+
+def test_split_profile_cuts_at_greeting_without_question():
+    assert split_profile("# Profile\n**FIRST_GREETING**: Hi there") == ("# Profile", "Hi there")
+
+
+def test_split_profile_without_labels():
+    assert split_profile("  # Profile only\n") == ("# Profile only", "")
+
+
+@pytest.mark.parametrize("reply", [
+    "What is a closure?",
+    "QUESTION: What is a closure?",
+    "**QUESTION:** What is a closure?",
+    "**Question**: What is a closure?",
+    "  _question_ :  What is a closure?",
+])
+def test_strip_label_variants(reply):
+    assert strip_label(reply) == "What is a closure?"
+
+
+def test_strip_label_only_strips_leading_label():
+    assert strip_label("**Evaluation**: Good. QUESTION: next") == "Good. QUESTION: next"
+
+
+def test_split_profile_keeps_markdown_in_the_opener():
+    raw = ("# Jordan Lee\n**FIRST_GREETING:** **Hello!** I'm Jordan.\n"
+           "**FIRST_QUESTION:** _Tell_ me about yourself.")
+    assert split_profile(raw) == (
+        "# Jordan Lee", "**Hello!** I'm Jordan.\n\n_Tell_ me about yourself.")
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ("QUESTION: **Design** a rate limiter", "**Design** a rate limiter"),
+    ("**QUESTION:** **Design** a rate limiter", "**Design** a rate limiter"),
+    ("**Question**: _Why_ this approach?", "_Why_ this approach?"),
+    ("_EVALUATION:_ *Solid* answer.", "*Solid* answer."),
+])
+def test_strip_label_keeps_markdown_in_the_reply(reply, expected):
+    assert strip_label(reply) == expected